@@ -1,7 +1,18 @@
 import threading
-from fastapi import FastAPI, Depends, HTTPException
+import sys
+import asyncio
+import random
+import math
+import logging
+import cProfile
+import contextvars
+from contextlib import contextmanager
+from array import array
+from collections import OrderedDict, deque
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.openapi.models import SecuritySchemeType
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, HTTPBasic
 from fastapi.middleware.cors import CORSMiddleware
 import markdown
@@ -13,6 +24,7 @@ import json
 import uvicorn
 import time
 import sqlite3
+import zlib
 import httpx
 from datetime import datetime, timezone, timedelta
 from pydantic import BaseModel
@@ -25,6 +37,22 @@ load_dotenv()
 
 API_KEY = os.getenv("OPENWEATHERMAP_API_KEY")
 HOUDINI = os.getenv("HOUDINI") == "true"
+FORECAST_CACHE_BYTES = int(os.getenv("FORECAST_CACHE_BYTES", 2 * 1024 * 1024))
+ADMIN_USER_IDS = {uid.strip() for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()}
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+UPSTREAM_DEADLINE_SECONDS = float(os.getenv("UPSTREAM_DEADLINE_SECONDS", 10))
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", 2))
+UPSTREAM_BACKOFF_SECONDS = float(os.getenv("UPSTREAM_BACKOFF_SECONDS", 0.2))
+UPSTREAM_BACKOFF_MAX_SECONDS = float(os.getenv("UPSTREAM_BACKOFF_MAX_SECONDS", 2))
+UPSTREAM_HEDGE_PERCENTILE = float(os.getenv("UPSTREAM_HEDGE_PERCENTILE", 0))
+RATE_LIMIT_DEFAULT_TIER = os.getenv("RATE_LIMIT_DEFAULT_TIER", "default")
+RATE_LIMIT_SHARED = os.getenv("RATE_LIMIT_SHARED") == "true"
+TRACE_LOG = os.getenv("TRACE_LOG") == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 1000))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 50))
 
 # Check for required environment variables and files
 if not API_KEY:
@@ -56,9 +84,11 @@ try:
 except redis.ConnectionError:
     use_redis = False
 
-# Configure SQLite as fallback
-sqlite_conn = sqlite3.connect(':memory:')
+# Configure SQLite as fallback; export and import batches use it from the threadpool
+sqlite_conn = sqlite3.connect(':memory:', check_same_thread=False)
 sqlite_cursor = sqlite_conn.cursor()
+# Writers hold this so a transaction on the shared connection is never interleaved with another
+sqlite_write_lock = threading.Lock()
 
 # Create tables for SQLite
 sqlite_cursor.execute(
@@ -82,34 +112,172 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Stage timings of the current request, as a list of (name, seconds)
+request_spans = contextvars.ContextVar("request_spans", default=None)
 
-def verify_token(token: str = None):
+# Runtime-adjustable profiling of slow requests, see /admin/profiling. With Redis
+# the settings are shared by all workers and re-read at most once a second.
+profiling_settings = {"sample_rate": PROFILE_SAMPLE_RATE, "slow_ms": PROFILE_SLOW_MS}
+profiling_settings_key = "admin:profiling_settings"
+profiling_settings_refreshed = 0.0
+profiling_lock = threading.Lock()
+
+trace_logger = logging.getLogger("horizon_weather.trace")
+if TRACE_LOG:
+    trace_logger.setLevel(logging.INFO)
+    trace_logger.addHandler(logging.StreamHandler())
+
+
+@contextmanager
+def span(name: str):
     """
-    Verify the Firebase token to authenticate the user.
+    Time a stage of the current request for the Server-Timing header.
+
+    Args:
+        name (str): Stage name; repeated names are summed.
+    """
+    spans = request_spans.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, time.perf_counter() - start))
+
+
+def get_profiling_settings(refresh: bool = False) -> dict:
+    """
+    Get the profiling settings, picking up changes made on other workers.
+
+    Args:
+        refresh (bool): Read the shared settings now instead of at most once a second.
+
+    Returns:
+        dict: Sample rate and slow request threshold in milliseconds.
+    """
+    global profiling_settings_refreshed
+    now = time.monotonic()
+    if use_redis and (refresh or now - profiling_settings_refreshed >= 1):
+        profiling_settings_refreshed = now
+        try:
+            stored = r.hgetall(profiling_settings_key)
+        except redis.RedisError:
+            stored = {}
+        for name, value in stored.items():
+            name = name.decode()
+            if name in profiling_settings:
+                profiling_settings[name] = float(value)
+    return profiling_settings
+
+
+def _save_profile(profiler: cProfile.Profile, path: str):
+    """
+    Write a profile to `PROFILE_DIR`, keeping only the newest
+    `PROFILE_MAX_FILES` profiles so the disk cannot fill up.
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, path))
+    profiles = [os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR) if name.endswith(".prof")]
+    profiles.sort(key=os.path.getmtime)
+    for old_profile in profiles[:-PROFILE_MAX_FILES]:
+        try:
+            os.remove(old_profile)
+        except FileNotFoundError:
+            pass  # Removed by another worker
+
+
+async def traced(name: str, awaitable):
+    with span(name):
+        return await awaitable
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """
+    Record stage timings of each request, return them in a Server-Timing
+    header and optionally log them. A sampled share of requests is profiled
+    and the profiles of slow ones are written to `PROFILE_DIR`.
+    """
+    spans = []
+    request_spans.set(spans)
+    settings = get_profiling_settings()
+    profiler = None
+    if random.random() < settings["sample_rate"] and profiling_lock.acquire(blocking=False):
+        # Only one profiler can be active; it also sees other requests running on the event loop
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        total = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            profiling_lock.release()
+            if total * 1000 >= settings["slow_ms"]:
+                path = request.url.path.strip("/").replace("/", "_") or "root"
+                await run_in_threadpool(_save_profile, profiler, f"{time.time_ns()}-{os.getpid()}-{path}.prof")
+
+    durations = {}
+    for name, duration in spans:
+        durations[name] = durations.get(name, 0) + duration * 1000
+    durations["total"] = total * 1000
+    response.headers["Server-Timing"] = ", ".join(f"{name};dur={ms:.1f}" for name, ms in durations.items())
+    if TRACE_LOG:
+        trace_logger.info(json.dumps({
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "spans_ms": {name: round(ms, 3) for name, ms in durations.items()},
+        }))
+    return response
+
+
+def verify_token_claims(token: str = None):
+    """
+    Verify the Firebase token and return its claims.
 
     Args:
         token (str): Firebase token.
 
     Returns:
-        str: User ID if token is valid, or dummy user ID if bypassing auth.
+        dict: Decoded token claims, or dummy claims if bypassing auth.
 
     Raises:
         HTTPException: If token is invalid or expired and not bypassing auth.
     """
     if HOUDINI:
-        return "houdini"
+        return {"uid": "houdini"}
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     try:
-        decoded_token = auth.verify_id_token(token)
-        user_id = decoded_token['uid']
-        return user_id
+        with span("verify_token"):
+            return auth.verify_id_token(token)
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
 
+def verify_token(token: str = None):
+    """
+    Verify the Firebase token to authenticate the user.
+
+    Args:
+        token (str): Firebase token.
+
+    Returns:
+        str: User ID if token is valid, or dummy user ID if bypassing auth.
+
+    Raises:
+        HTTPException: If token is invalid or expired and not bypassing auth.
+    """
+    return verify_token_claims(token)['uid']
+
+
 @app.get("/", response_class=HTMLResponse, summary="Read Root", description="Serve the README.md file as styled HTML.")
 async def read_root():
     """
@@ -307,6 +475,368 @@ class ForecastDataResponse(BaseModel):
     city: City
 
 
+# Sentinel for missing integer fields in the compact forecast columns
+_MISSING_INT = -(2 ** 63)
+
+_FORECAST_FLOAT_FIELDS = ("temp", "feels_like", "temp_min", "temp_max", "temp_kf", "wind_speed", "wind_gust", "pop",
+                          "rain_3h", "snow_3h")
+_FORECAST_INT_FIELDS = ("dt", "pressure", "sea_level", "grnd_level", "humidity", "clouds", "wind_deg", "visibility")
+
+
+# Pool of weather condition tuples; OpenWeather has only a few dozen conditions,
+# so the pool is capped and tuples beyond the cap are simply not shared
+_weather_conditions = {}
+_weather_conditions_bytes = 0
+MAX_WEATHER_CONDITIONS = 1024
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _conditions_size(conditions: tuple) -> int:
+    return sys.getsizeof(conditions) + sum(sys.getsizeof(w) + sum(sys.getsizeof(field) for field in w)
+                                           for w in conditions)
+
+
+def _intern_weather(weather: list) -> tuple:
+    global _weather_conditions_bytes
+    conditions = tuple((w["id"], _intern(w["main"]), _intern(w["description"]), _intern(w["icon"])) for w in weather)
+    shared = _weather_conditions.get(conditions)
+    if shared is not None:
+        return shared
+    if len(_weather_conditions) < MAX_WEATHER_CONDITIONS:
+        _weather_conditions[conditions] = conditions
+        _weather_conditions_bytes += _conditions_size(conditions)
+    return conditions
+
+
+class CompactForecast:
+    """
+    Column-oriented copy of a 5-day/3-hour forecast.
+
+    Numeric fields of every list item are packed into typed arrays, and the
+    repeated strings (weather main/description/icon, pod) and weather condition
+    tuples are interned so all cached forecasts share a single copy of each.
+    `dt_txt` is not stored since it is derived from `dt`.
+
+    All fields of the OpenWeather forecast item are kept, including the
+    optional `rain.3h` and `snow.3h`; keys outside that schema are dropped.
+    """
+    __slots__ = ("cod", "message", "city", "floats", "ints", "weather", "pod", "version", "nbytes")
+
+    def __init__(self, forecast_data: dict, version: Optional[int] = None):
+        items = forecast_data["list"]
+        self.cod = _intern(str(forecast_data.get("cod", "200")))
+        self.message = forecast_data.get("message", 0)
+        city = forecast_data["city"]
+        self.city = (city.get("id"), _intern(city.get("name")), city["coord"]["lat"], city["coord"]["lon"],
+                     _intern(city.get("country")), city.get("population"), city.get("timezone"),
+                     city.get("sunrise"), city.get("sunset"))
+        float_rows = []
+        int_rows = []
+        weather = []
+        pod = []
+        for item in items:
+            main = item.get("main", {})
+            wind = item.get("wind", {})
+            floats = (main.get("temp"), main.get("feels_like"), main.get("temp_min"), main.get("temp_max"),
+                      main.get("temp_kf"), wind.get("speed"), wind.get("gust"), item.get("pop"),
+                      item.get("rain", {}).get("3h"), item.get("snow", {}).get("3h"))
+            ints = (item.get("dt"), main.get("pressure"), main.get("sea_level"), main.get("grnd_level"),
+                    main.get("humidity"), item.get("clouds", {}).get("all"), wind.get("deg"), item.get("visibility"))
+            float_rows.append([float("nan") if value is None else value for value in floats])
+            int_rows.append([_MISSING_INT if value is None else int(value) for value in ints])
+            weather.append(_intern_weather(item.get("weather", [])))
+            pod.append(_intern(item.get("sys", {}).get("pod")))
+        # Build each column in one go so the arrays are not over-allocated
+        self.floats = {name: array("d", column) for name, column in zip(_FORECAST_FLOAT_FIELDS, zip(*float_rows))}
+        self.ints = {name: array("q", column) for name, column in zip(_FORECAST_INT_FIELDS, zip(*int_rows))}
+        self.weather = tuple(weather)
+        self.pod = tuple(pod)
+        self.version = version
+        self.nbytes = self._measure()
+
+    def _measure(self):
+        """
+        Estimate the memory held by this record. Interned strings and pooled
+        weather conditions are shared between records and are not counted.
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.city)
+        for columns in (self.floats, self.ints):
+            size += sys.getsizeof(columns) + sum(sys.getsizeof(column) for column in columns.values())
+        size += sum(_conditions_size(entry) for entry in {id(entry): entry for entry in self.weather}.values()
+                    if _weather_conditions.get(entry) is not entry)
+        return size + sys.getsizeof(self.weather) + sys.getsizeof(self.pod)
+
+    def to_response(self) -> dict:
+        """
+        Render the record in the `ForecastDataResponse` shape.
+
+        Returns:
+            dict: Forecast data as returned by the OpenWeather forecast API.
+        """
+
+        def pick(source, names, index, missing):
+            out = {}
+            for key, name in names:
+                value = source[name][index]
+                if missing(value):
+                    continue
+                out[key] = value
+            return out
+
+        is_nan = lambda value: value != value
+        is_missing_int = lambda value: value == _MISSING_INT
+        items = []
+        for i in range(len(self.pod)):
+            main = pick(self.floats, (("temp", "temp"), ("feels_like", "feels_like"), ("temp_min", "temp_min"),
+                                      ("temp_max", "temp_max")), i, is_nan)
+            main.update(pick(self.ints, (("pressure", "pressure"), ("sea_level", "sea_level"),
+                                         ("grnd_level", "grnd_level"), ("humidity", "humidity")), i, is_missing_int))
+            main.update(pick(self.floats, (("temp_kf", "temp_kf"),), i, is_nan))
+            wind = pick(self.floats, (("speed", "wind_speed"),), i, is_nan)
+            wind.update(pick(self.ints, (("deg", "wind_deg"),), i, is_missing_int))
+            wind.update(pick(self.floats, (("gust", "wind_gust"),), i, is_nan))
+            item = {
+                "dt": self.ints["dt"][i],
+                "main": main,
+                "weather": [{"id": w[0], "main": w[1], "description": w[2], "icon": w[3]} for w in self.weather[i]],
+                "clouds": pick(self.ints, (("all", "clouds"),), i, is_missing_int),
+                "wind": wind,
+            }
+            item.update(pick(self.ints, (("visibility", "visibility"),), i, is_missing_int))
+            item.update(pick(self.floats, (("pop", "pop"),), i, is_nan))
+            for key in ("rain", "snow"):
+                precipitation = pick(self.floats, (("3h", f"{key}_3h"),), i, is_nan)
+                if precipitation:
+                    item[key] = precipitation
+            item["sys"] = {"pod": self.pod[i]}
+            item["dt_txt"] = datetime.fromtimestamp(item["dt"], timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            items.append(item)
+
+        city_id, name, lat, lon, country, population, tz_offset, sunrise, sunset = self.city
+        return {
+            "cod": self.cod,
+            "message": self.message,
+            "cnt": len(items),
+            "list": items,
+            "city": {
+                "id": city_id,
+                "name": name,
+                "coord": {"lat": lat, "lon": lon},
+                "country": country,
+                "population": population,
+                "timezone": tz_offset,
+                "sunrise": sunrise,
+                "sunset": sunset,
+            },
+        }
+
+
+class ForecastCache:
+    """
+    In-process LRU cache of the latest forecast per user and location, bounded
+    by an approximate byte budget.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def put(self, key: tuple, forecast_data: dict, version: Optional[int] = None):
+        """
+        Store a forecast, evicting the least recently used entries until the
+        cache fits its budget. Forecasts that cannot be packed are skipped.
+
+        Args:
+            key (tuple): (user_id, lat, lon) the forecast belongs to.
+            forecast_data (dict): Raw forecast data from OpenWeather.
+            version (int): Version of the stored forecast, see `get`.
+        """
+        self.discard(key)
+        try:
+            record = CompactForecast(forecast_data, version)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return
+        if record.nbytes > self.max_bytes:
+            return
+        self._entries[key] = record
+        self.nbytes += record.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def get(self, key: tuple, version: Optional[int] = None) -> Optional[dict]:
+        """
+        Get a cached forecast rendered as a `ForecastDataResponse` dict.
+
+        Args:
+            key (tuple): (user_id, lat, lon) the forecast belongs to.
+            version (int): Version of the stored forecast; a cached forecast
+                with a different version is stale and is dropped.
+
+        Returns:
+            dict: Forecast data, or None if the key is not cached.
+        """
+        record = self._entries.get(key)
+        if record is not None and record.version != version:
+            self.discard(key)
+            record = None
+        if record is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return record.to_response()
+
+    def discard(self, key: tuple):
+        record = self._entries.pop(key, None)
+        if record is not None:
+            self.nbytes -= record.nbytes
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            # Shared by all records, so not part of the per-record budget
+            "weather_conditions": len(_weather_conditions),
+            "weather_conditions_bytes": _weather_conditions_bytes,
+        }
+
+
+forecast_cache = ForecastCache(FORECAST_CACHE_BYTES)
+
+
+def _parse_rate_limit_tiers(value: str) -> dict:
+    """
+    Parse tier limits of the form "free=10/60,pro=60/60" (requests/seconds).
+
+    Returns:
+        dict: Tier name mapped to (capacity, tokens per second).
+    """
+    tiers = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        name, limit = entry.split("=")
+        requests, seconds = limit.split("/")
+        tiers[name.strip()] = (float(requests), float(requests) / float(seconds))
+    return tiers
+
+
+RATE_LIMIT_TIERS = _parse_rate_limit_tiers(os.getenv("RATE_LIMIT_TIERS", "default=10/60"))
+
+
+class TokenBucketLimiter:
+    """
+    In-process token bucket per key. Each bucket is a (tokens, updated) tuple.
+
+    At most `max_buckets` buckets are kept; the least recently used one is
+    evicted first, which at worst hands an idle user a full bucket again.
+    """
+    max_buckets = 10000
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+
+    def acquire(self, key: str, capacity: float, rate: float) -> float:
+        """
+        Take a token from the bucket of a key.
+
+        Args:
+            key (str): Bucket key, e.g. the user ID.
+            capacity (float): Maximum number of tokens (burst size).
+            rate (float): Tokens added per second.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = capacity
+            if len(self._buckets) >= self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+        self._buckets[key] = (tokens - 1, now)
+        return 0
+
+
+class RedisTokenBucketLimiter:
+    """
+    Token bucket per key stored in Redis, shared between workers.
+    """
+    script = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local retry_after = 0
+    if tokens < 1 then
+        retry_after = (1 - tokens) / rate
+    else
+        tokens = tokens - 1
+    end
+    redis.call('HMSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self, client: redis.Redis, fallback: TokenBucketLimiter):
+        self._acquire = client.register_script(self.script)
+        self._fallback = fallback
+
+    def acquire(self, key: str, capacity: float, rate: float) -> float:
+        try:
+            return float(self._acquire(keys=[f"{key}:rate_limit"], args=[capacity, rate, time.time()]))
+        except redis.RedisError:
+            return self._fallback.acquire(key, capacity, rate)
+
+
+def check_rate_limit(user_id: str, tier: Optional[str]):
+    """
+    Enforce the rate limit of a user's tier.
+
+    Args:
+        user_id (str): User ID.
+        tier (str): Tier of the user; unknown tiers use `RATE_LIMIT_DEFAULT_TIER`.
+
+    Raises:
+        HTTPException: If the user is over the limit, with a Retry-After header.
+    """
+    limit = RATE_LIMIT_TIERS.get(tier) or RATE_LIMIT_TIERS.get(RATE_LIMIT_DEFAULT_TIER)
+    if limit is None:
+        return
+    retry_after = rate_limiter.acquire(user_id, *limit)
+    if retry_after > 0:
+        raise HTTPException(status_code=429, detail="Rate limit exceeded",
+                            headers={"Retry-After": str(math.ceil(retry_after))})
+
+
+if RATE_LIMIT_SHARED and use_redis:
+    rate_limiter = RedisTokenBucketLimiter(r, TokenBucketLimiter())
+else:
+    rate_limiter = TokenBucketLimiter()
+
+
 @app.post(
     "/update_weather/",
     summary="Update Weather Data",
@@ -333,6 +863,16 @@ class ForecastDataResponse(BaseModel):
                     }
                 }
             }
+        },
+        429: {
+            "description": "Rate limit exceeded, retry after the number of seconds in the Retry-After header",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Rate limit exceeded"
+                    }
+                }
+            }
         }
     }
 )
@@ -348,7 +888,10 @@ async def update_weather(lat: float, lon: float, token: str = Depends(oauth2_sch
     Returns:
         dict: Detail message indicating the weather data update status with a human-readable timestamp.
     """
-    user_id = verify_token(token)
+    claims = verify_token_claims(token)
+    user_id = claims['uid']
+    with span("rate_limit"):
+        check_rate_limit(user_id, claims.get('tier'))
     await save_weather_data(user_id, lat, lon)
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     return {"detail": "Weather data updated", "timestamp": timestamp}
@@ -625,18 +1168,279 @@ async def get_forecast_data(lat: float, lon: float, token: str = Depends(oauth2_
         token (str): Firebase token.
 
     Returns:
-        list: Forecast weather data for the specified location.
+        list: Latest forecast weather data for the specified location, or an empty list.
     """
     user_id = verify_token(token)
+    key = (user_id, lat, lon)
     if use_redis:
-        data = r.get(f"{user_id}:forecast_data:{lat}:{lon}")
-        if data:
-            return json.loads(data)
+        # The version key is bumped on every write, so other workers' writes invalidate our cached copy
+        version = r.get(f"{user_id}:forecast_version:{lat}:{lon}")
+        if version is not None:
+            data = forecast_cache.get(key, int(version))
+            if data:
+                return [data]
+        data, version = r.mget(f"{user_id}:forecast_data:{lat}:{lon}", f"{user_id}:forecast_version:{lat}:{lon}")
+        if data is not None and version is None:
+            # Forecast stored before it was versioned
+            version = r.incr(f"{user_id}:forecast_version:{lat}:{lon}")
     else:
-        sqlite_cursor.execute("SELECT data FROM forecast_data WHERE user_id=? AND lat=? AND lon=?", (user_id, lat, lon))
-        rows = sqlite_cursor.fetchall()
-        data = [json.loads(row[0]) for row in rows]
-    return data
+        data = forecast_cache.get(key)
+        if data:
+            return [data]
+        sqlite_cursor.execute("SELECT data FROM forecast_data WHERE user_id=? AND lat=? AND lon=? "
+                              "ORDER BY rowid DESC LIMIT 1", (user_id, lat, lon))
+        row = sqlite_cursor.fetchone()
+        data, version = row[0] if row else None, None
+    if not data:
+        return []
+    data = json.loads(data)
+    forecast_cache.put(key, data, int(version) if version is not None else None)
+    return [data]
+
+
+@app.get(
+    "/admin/stats",
+    summary="Service Statistics",
+    description="Get forecast cache usage and upstream call policy counters.",
+    responses={
+        403: {
+            "description": "Admin access required",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Admin access required"
+                    }
+                }
+            }
+        }
+    }
+)
+async def get_stats(token: str = Depends(oauth2_scheme)):
+    """
+    Get forecast cache usage and upstream call policy counters.
+
+    Args:
+        token (str): Firebase token of an administrator.
+
+    Returns:
+        dict: Forecast cache statistics and upstream counters.
+    """
+    verify_admin(token)
+    return {
+        "forecast_cache": forecast_cache.stats(),
+        "upstream": dict(upstream_stats, hedge_delay=_hedge_delay()),
+    }
+
+
+class ProfilingSettings(BaseModel):
+    sample_rate: float
+    slow_ms: float
+
+
+@app.post(
+    "/admin/profiling",
+    summary="Configure Profiling",
+    description="Set the share of requests that are profiled and the duration above which their profiles are saved.",
+    response_model=ProfilingSettings,
+    responses={
+        200: {
+            "description": "Profiling settings updated",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "sample_rate": 0.05,
+                        "slow_ms": 1000
+                    }
+                }
+            }
+        },
+        403: {
+            "description": "Admin access required",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Admin access required"
+                    }
+                }
+            }
+        }
+    }
+)
+async def configure_profiling(sample_rate: Optional[float] = None, slow_ms: Optional[float] = None,
+                              token: str = Depends(oauth2_scheme)):
+    """
+    Configure profiling of slow requests at runtime. Profiles are written to
+    `PROFILE_DIR` as `.prof` files readable with `pstats` or snakeviz. With
+    Redis the settings apply to all workers within a second; without it they
+    only apply to the worker that handled this call.
+
+    Args:
+        sample_rate (float): Share of requests to profile, from 0 (off) to 1.
+        slow_ms (float): Requests taking at least this many milliseconds have their profile saved.
+        token (str): Firebase token of an administrator.
+
+    Returns:
+        dict: The profiling settings now in effect.
+    """
+    verify_admin(token)
+    if sample_rate is not None and not 0 <= sample_rate <= 1:
+        raise HTTPException(status_code=422, detail="sample_rate must be between 0 and 1")
+    if slow_ms is not None and slow_ms < 0:
+        raise HTTPException(status_code=422, detail="slow_ms must not be negative")
+    settings = get_profiling_settings(refresh=True)
+    if sample_rate is not None:
+        settings["sample_rate"] = sample_rate
+    if slow_ms is not None:
+        settings["slow_ms"] = slow_ms
+    if use_redis:
+        r.hset(profiling_settings_key, mapping=settings)
+    return settings
+
+
+# Counters for the upstream call policies
+upstream_stats = {
+    "requests": 0,
+    "retries": 0,
+    "hedges": 0,
+    "hedge_wins": 0,
+    "deadline_exceeded": 0,
+    "failures": 0,
+}
+
+# Recent upstream latencies, used to derive the hedging delay
+upstream_latencies = deque(maxlen=200)
+HEDGE_MIN_SAMPLES = 20
+
+
+def _hedge_delay() -> Optional[float]:
+    """
+    Get the delay after which a hedged request is sent.
+
+    Returns:
+        float: The configured percentile of recent upstream latencies in seconds,
+        or None if hedging is disabled or there are too few samples.
+    """
+    if UPSTREAM_HEDGE_PERCENTILE <= 0 or len(upstream_latencies) < HEDGE_MIN_SAMPLES:
+        return None
+    latencies = sorted(upstream_latencies)
+    return latencies[min(len(latencies) - 1, int(len(latencies) * UPSTREAM_HEDGE_PERCENTILE / 100))]
+
+
+async def _get(client: httpx.AsyncClient, url: str, deadline: float):
+    return await client.get(url, timeout=max(deadline - asyncio.get_running_loop().time(), 0.001))
+
+
+async def _hedged_get(client: httpx.AsyncClient, url: str, deadline: float):
+    """
+    Send a GET request, plus a second identical one if the first has not
+    answered within the hedging delay. The first response to arrive wins.
+
+    The latency sample is always taken from the start of the first request.
+    When the hedge wins, that is a lower bound of the first request's own
+    latency, which still lies above the hedging delay, so the tail of the
+    sample is kept and the hedging percentile is not underestimated.
+
+    Args:
+        client (httpx.AsyncClient): HTTP client.
+        url (str): URL to request.
+        deadline (float): Event loop time by which the request must finish.
+
+    Returns:
+        httpx.Response: The first successful response.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    delay = _hedge_delay()
+    if delay is None or start + delay >= deadline:
+        response = await _get(client, url, deadline)
+        upstream_latencies.append(loop.time() - start)
+        return response
+
+    primary = asyncio.ensure_future(_get(client, url, deadline))
+    pending = {primary}
+    error = None
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            response = primary.result()
+            upstream_latencies.append(loop.time() - start)
+            return response
+
+        upstream_stats["hedges"] += 1
+        hedge = asyncio.ensure_future(_get(client, url, deadline))
+        pending.add(hedge)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        upstream_stats["hedge_wins"] += 1
+                    upstream_latencies.append(loop.time() - start)
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+class UpstreamError(Exception):
+    """
+    Raised when the OpenWeather API answers with an error status.
+    """
+
+    def __init__(self, status_code: int):
+        super().__init__(f"OpenWeather API returned {status_code}")
+        self.status_code = status_code
+
+
+async def _get_with_retries(client: httpx.AsyncClient, url: str, deadline: float):
+    """
+    GET a URL, retrying transport errors and 5xx responses with exponential
+    backoff and full jitter while the deadline allows it.
+
+    A 429 means the API quota is used up, so it is only retried when the
+    API sends a Retry-After that still fits in the deadline.
+
+    Args:
+        client (httpx.AsyncClient): HTTP client.
+        url (str): URL to request.
+        deadline (float): Event loop time by which the request must finish.
+
+    Returns:
+        httpx.Response: A successful response.
+
+    Raises:
+        httpx.TransportError: If the last attempt failed to reach the API.
+        UpstreamError: If the API answered with an error status that is not
+            retried, or retries ran out.
+    """
+    loop = asyncio.get_running_loop()
+    attempt = 0
+    while True:
+        upstream_stats["requests"] += 1
+        try:
+            response = await _hedged_get(client, url, deadline)
+            if response.status_code < 400:
+                return response
+            error = UpstreamError(response.status_code)
+            if response.status_code < 500 and response.status_code != 429:
+                raise error
+        except httpx.TransportError as e:
+            response, error = None, e
+
+        backoff = random.uniform(0, min(UPSTREAM_BACKOFF_MAX_SECONDS, UPSTREAM_BACKOFF_SECONDS * 2 ** attempt))
+        if response is not None and response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            if not retry_after.isdigit():
+                raise error
+            backoff = max(backoff, int(retry_after))
+        if attempt >= UPSTREAM_RETRIES or loop.time() + backoff >= deadline:
+            raise error
+        attempt += 1
+        upstream_stats["retries"] += 1
+        await asyncio.sleep(backoff)
 
 
 async def fetch_weather_data(lat: float, lon: float):
@@ -647,17 +1451,39 @@ async def fetch_weather_data(lat: float, lon: float):
         lat (float): Latitude of the location.
         lon (float): Longitude of the location.
 
+    Both calls share a single deadline of `UPSTREAM_DEADLINE_SECONDS`.
+
     Returns:
         tuple: Current weather data and forecast weather data.
+
+    Raises:
+        HTTPException: If the deadline is exceeded or the API cannot be reached
+            or answers with an error.
     """
+    current_weather_url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&units=metric&appid={API_KEY}"
+    forecast_weather_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&units=metric&appid={API_KEY}"
+    deadline = asyncio.get_running_loop().time() + UPSTREAM_DEADLINE_SECONDS
     async with httpx.AsyncClient() as client:
-        current_weather_response = await client.get(
-            f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&units=metric&appid={API_KEY}")
-        forecast_weather_response = await client.get(
-            f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&units=metric&appid={API_KEY}")
-
-        current_weather_data = current_weather_response.json()
-        forecast_weather_data = forecast_weather_response.json()
+        tasks = [
+            asyncio.ensure_future(traced("upstream_weather", _get_with_retries(client, current_weather_url, deadline))),
+            asyncio.ensure_future(traced("upstream_forecast", _get_with_retries(client, forecast_weather_url, deadline))),
+        ]
+        try:
+            current_weather_response, forecast_weather_response = await asyncio.wait_for(
+                asyncio.gather(*tasks), UPSTREAM_DEADLINE_SECONDS)
+            current_weather_data = current_weather_response.json()
+            forecast_weather_data = forecast_weather_response.json()
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            upstream_stats["deadline_exceeded"] += 1
+            raise HTTPException(status_code=504, detail="Weather service timed out")
+        except (httpx.TransportError, UpstreamError, ValueError):
+            upstream_stats["failures"] += 1
+            raise HTTPException(status_code=502, detail="Weather service unavailable")
+        finally:
+            # Stop the other call when one fails, and let both finish before the client is closed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
         return current_weather_data, forecast_weather_data
 
 
@@ -688,22 +1514,364 @@ async def save_weather_data(user_id: str, lat: float, lon: float):
     current_weather_data, forecast_weather_data = await fetch_weather_data(lat, lon)
 
     # Convert Unix timestamps to human-readable datetime with timezone adjustment
-    tz_offset = current_weather_data["timezone"]
-    current_weather_data["dt"] = unix_to_datetime(current_weather_data["dt"], tz_offset)
-    current_weather_data["sys"]["sunrise"] = unix_to_datetime(current_weather_data["sys"]["sunrise"], tz_offset)
-    current_weather_data["sys"]["sunset"] = unix_to_datetime(current_weather_data["sys"]["sunset"], tz_offset)
+    with span("convert"):
+        tz_offset = current_weather_data["timezone"]
+        current_weather_data["dt"] = unix_to_datetime(current_weather_data["dt"], tz_offset)
+        current_weather_data["sys"]["sunrise"] = unix_to_datetime(current_weather_data["sys"]["sunrise"], tz_offset)
+        current_weather_data["sys"]["sunset"] = unix_to_datetime(current_weather_data["sys"]["sunset"], tz_offset)
+
+    with span("encode"):
+        current_weather_json = json.dumps(current_weather_data)
+        forecast_weather_json = json.dumps(forecast_weather_data)
 
     timestamp = int(time.time())
+    with span("storage"):
+        if use_redis:
+            pipe = r.pipeline()
+            pipe.set(f"{user_id}:weather_data:{lat}:{lon}:{timestamp}", current_weather_json)
+            pipe.expireat(f"{user_id}:weather_data:{lat}:{lon}:{timestamp}", timestamp + 30 * 24 * 3600)
+            pipe.set(f"{user_id}:forecast_data:{lat}:{lon}", forecast_weather_json)
+            pipe.incr(f"{user_id}:forecast_version:{lat}:{lon}")
+            version = pipe.execute()[-1]
+        else:
+            with sqlite_write_lock:
+                sqlite_cursor.execute(
+                    "INSERT INTO weather_data (user_id, lat, lon, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                    (user_id, lat, lon, timestamp, current_weather_json))
+                # Only the latest forecast is kept, as on Redis
+                sqlite_cursor.execute("DELETE FROM forecast_data WHERE user_id=? AND lat=? AND lon=?",
+                                      (user_id, lat, lon))
+                sqlite_cursor.execute("INSERT INTO forecast_data (user_id, lat, lon, data) VALUES (?, ?, ?, ?)",
+                                      (user_id, lat, lon, forecast_weather_json))
+                sqlite_conn.commit()
+            version = None
+
+    with span("cache"):
+        forecast_cache.put((user_id, lat, lon), forecast_weather_data, version)
+
+
+def verify_admin(token: str = None):
+    """
+    Verify the Firebase token and check that the user is an administrator.
+
+    Args:
+        token (str): Firebase token.
+
+    Returns:
+        str: User ID of the administrator.
+
+    Raises:
+        HTTPException: If the token is invalid or the user is not an administrator.
+    """
+    user_id = verify_token(token)
+    if HOUDINI or user_id in ADMIN_USER_IDS:
+        return user_id
+    raise HTTPException(status_code=403, detail="Admin access required")
+
+
+class ImportResponse(BaseModel):
+    detail: str
+    weather_data: int
+    forecast_data: int
+
+
+def _export_line(record_type: str, user_id: str, lat: float, lon: float, timestamp, data: str) -> str:
+    # Splice the stored JSON in as-is rather than decoding and re-encoding it
+    header = json.dumps({"type": record_type, "user_id": user_id, "lat": lat, "lon": lon, "timestamp": timestamp})
+    return f'{header[:-1]}, "data": {data}}}\n'
+
+
+async def iter_export_lines(batch_size: int):
+    """
+    Iterate over every stored weather and forecast record as NDJSON lines.
+
+    Uses SCAN on Redis and a batched SQL cursor on SQLite so only one batch
+    is held in memory at a time. Each batch is fetched in the threadpool so
+    the export does not block other requests.
+
+    Args:
+        batch_size (int): Number of records to read per round trip.
+
+    Yields:
+        str: One NDJSON line per record.
+    """
     if use_redis:
-        await r.set(f"{user_id}:weather_data:{lat}:{lon}:{timestamp}", json.dumps(current_weather_data))
-        await r.expireat(f"{user_id}:weather_data:{lat}:{lon}:{timestamp}", timestamp + 30 * 24 * 3600)
-        await r.set(f"{user_id}:forecast_data:{lat}:{lon}", json.dumps(forecast_weather_data))
+        for record_type, pattern in (("weather_data", "*:weather_data:*"), ("forecast_data", "*:forecast_data:*")):
+            cursor = 0
+            while True:
+                cursor, keys, values = await run_in_threadpool(_scan_redis_batch, cursor, pattern, batch_size)
+                for line in _export_redis_batch(record_type, keys, values):
+                    yield line
+                if cursor == 0:
+                    break
     else:
-        sqlite_cursor.execute("INSERT INTO weather_data (user_id, lat, lon, timestamp, data) VALUES (?, ?, ?, ?, ?)",
-                              (user_id, lat, lon, timestamp, json.dumps(current_weather_data)))
-        sqlite_cursor.execute("INSERT INTO forecast_data (user_id, lat, lon, data) VALUES (?, ?, ?, ?)",
-                              (user_id, lat, lon, json.dumps(forecast_weather_data)))
-        sqlite_conn.commit()
+        queries = (
+            ("weather_data", "SELECT user_id, lat, lon, timestamp, data FROM weather_data"),
+            ("forecast_data", "SELECT user_id, lat, lon, NULL, data FROM forecast_data"),
+        )
+        for record_type, query in queries:
+            cursor = await run_in_threadpool(sqlite_conn.execute, query)
+            while True:
+                rows = await run_in_threadpool(cursor.fetchmany, batch_size)
+                if not rows:
+                    break
+                for user_id, lat, lon, timestamp, data in rows:
+                    yield _export_line(record_type, user_id, lat, lon,
+                                       int(timestamp) if timestamp is not None else None, data)
+            cursor.close()
+
+
+def _scan_redis_batch(cursor: int, pattern: str, batch_size: int) -> tuple:
+    cursor, keys = r.scan(cursor, match=pattern, count=batch_size)
+    return cursor, keys, r.mget(keys) if keys else []
+
+
+def _export_redis_batch(record_type: str, keys: list, values: list):
+    for key, data in zip(keys, values):
+        if data is None:
+            continue  # Expired between SCAN and MGET
+        key = key.decode()
+        if record_type == "weather_data":
+            user_id, _, lat, lon, timestamp = key.rsplit(":", 4)
+            timestamp = int(timestamp)
+        else:
+            user_id, _, lat, lon = key.rsplit(":", 3)
+            timestamp = None
+        yield _export_line(record_type, user_id, float(lat), float(lon), timestamp, data.decode())
+
+
+async def iter_gzip(lines):
+    """
+    Gzip-compress an async stream of text lines.
+
+    Args:
+        lines: Async iterator of strings.
+
+    Yields:
+        bytes: Compressed chunks.
+    """
+    compressor = zlib.compressobj(wbits=31)
+    async for line in lines:
+        chunk = compressor.compress(line.encode())
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+@app.get(
+    "/admin/export",
+    summary="Export Weather Data",
+    description="Stream every user's weather history and forecasts as gzip-compressed NDJSON.",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Gzip-compressed NDJSON stream", "content": {"application/gzip": {}}},
+        403: {
+            "description": "Admin access required",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Admin access required"
+                    }
+                }
+            }
+        }
+    }
+)
+async def export_data(batch_size: int = EXPORT_BATCH_SIZE, token: str = Depends(oauth2_scheme)):
+    """
+    Stream all stored weather and forecast data.
+
+    Args:
+        batch_size (int): Number of records to read from the backend per round trip.
+        token (str): Firebase token of an administrator.
+
+    Returns:
+        StreamingResponse: Gzip-compressed NDJSON, one record per line.
+    """
+    verify_admin(token)
+    if batch_size < 1:
+        raise HTTPException(status_code=422, detail="batch_size must be positive")
+    filename = f"horizon-weather-{int(time.time())}.ndjson.gz"
+    return StreamingResponse(
+        iter_gzip(iter_export_lines(batch_size)),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def iter_import_records(request: Request):
+    """
+    Decode a (optionally gzip-compressed) NDJSON request body record by record.
+
+    Args:
+        request (Request): Incoming request with the NDJSON body.
+
+    Yields:
+        dict: One decoded record per line.
+    """
+    decompressor = None
+    buffer = b""
+    async for chunk in request.stream():
+        if decompressor is None and chunk:
+            # Accept both gzip/zlib-compressed and plain NDJSON bodies
+            decompressor = zlib.decompressobj(wbits=47) if chunk[:1] in (b"\x1f", b"\x78") else False
+        buffer += decompressor.decompress(chunk) if decompressor else chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if decompressor:
+        buffer += decompressor.flush()
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+def _parse_import_record(record: dict) -> tuple:
+    """
+    Validate an imported record.
+
+    Returns:
+        tuple: (type, user_id, lat, lon, timestamp, data as JSON).
+
+    Raises:
+        ValueError, KeyError, TypeError: If the record is malformed.
+    """
+    record_type = record["type"]
+    if record_type not in ("weather_data", "forecast_data"):
+        raise ValueError(f"unknown record type {record_type!r}")
+    user_id = record["user_id"]
+    if not isinstance(user_id, str) or not user_id:
+        raise ValueError("user_id must be a non-empty string")
+    timestamp = int(record["timestamp"]) if record_type == "weather_data" else None
+    return record_type, user_id, float(record["lat"]), float(record["lon"]), timestamp, json.dumps(record["data"])
+
+
+def _import_batch(batch: list) -> tuple:
+    """
+    Write a batch of imported records in one Redis MULTI/EXEC transaction
+    or SQLite transaction. The whole batch is validated before anything is
+    written, and a failed SQLite write is rolled back. Runs in the threadpool.
+
+    Returns:
+        tuple: Number of imported weather records and the keys of the imported forecasts.
+    """
+    records = [_parse_import_record(record) for record in batch]
+    weather_count = 0
+    forecast_keys = []
+    if use_redis:
+        expiry_cutoff = int(time.time()) - 30 * 24 * 3600
+        pipe = r.pipeline()
+        for record_type, user_id, lat, lon, timestamp, data in records:
+            if record_type == "weather_data":
+                if timestamp < expiry_cutoff:
+                    continue
+                key = f"{user_id}:weather_data:{lat}:{lon}:{timestamp}"
+                pipe.set(key, data)
+                pipe.expireat(key, timestamp + 30 * 24 * 3600)
+                weather_count += 1
+            else:
+                pipe.set(f"{user_id}:forecast_data:{lat}:{lon}", data)
+                pipe.incr(f"{user_id}:forecast_version:{lat}:{lon}")
+                forecast_keys.append((user_id, lat, lon))
+        pipe.execute()
+    else:
+        with sqlite_write_lock:
+            cursor = sqlite_conn.cursor()
+            try:
+                for record_type, user_id, lat, lon, timestamp, data in records:
+                    if record_type == "weather_data":
+                        cursor.execute(
+                            "INSERT INTO weather_data (user_id, lat, lon, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                            (user_id, lat, lon, timestamp, data))
+                        weather_count += 1
+                    else:
+                        cursor.execute("DELETE FROM forecast_data WHERE user_id=? AND lat=? AND lon=?",
+                                       (user_id, lat, lon))
+                        cursor.execute("INSERT INTO forecast_data (user_id, lat, lon, data) VALUES (?, ?, ?, ?)",
+                                       (user_id, lat, lon, data))
+                        forecast_keys.append((user_id, lat, lon))
+                sqlite_conn.commit()
+            except Exception:
+                sqlite_conn.rollback()
+                raise
+            finally:
+                cursor.close()
+    return weather_count, forecast_keys
+
+
+async def _apply_import_batch(batch: list) -> tuple:
+    weather_count, forecast_keys = await run_in_threadpool(_import_batch, batch)
+    for key in forecast_keys:
+        forecast_cache.discard(key)
+    return weather_count, len(forecast_keys)
+
+
+@app.post(
+    "/admin/import",
+    summary="Import Weather Data",
+    description="Backfill weather history and forecasts from a gzip-compressed or plain NDJSON export.",
+    response_model=ImportResponse,
+    responses={
+        200: {
+            "description": "Data imported successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Import complete",
+                        "weather_data": 1200,
+                        "forecast_data": 40
+                    }
+                }
+            }
+        },
+        403: {
+            "description": "Admin access required",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Admin access required"
+                    }
+                }
+            }
+        }
+    }
+)
+async def import_data(request: Request, batch_size: int = IMPORT_BATCH_SIZE, token: str = Depends(oauth2_scheme)):
+    """
+    Import weather and forecast data produced by `/admin/export`.
+
+    Records are written in batches from the threadpool: one Redis MULTI/EXEC
+    or SQLite transaction per batch. A malformed record fails its whole batch, but
+    batches written before it stay written.
+
+    Args:
+        request (Request): Incoming request with the NDJSON body.
+        batch_size (int): Number of records to write per pipeline or transaction.
+        token (str): Firebase token of an administrator.
+
+    Returns:
+        dict: Detail message and the number of imported weather and forecast records.
+    """
+    verify_admin(token)
+    if batch_size < 1:
+        raise HTTPException(status_code=422, detail="batch_size must be positive")
+    weather_count = 0
+    forecast_count = 0
+    batch = []
+    try:
+        async for record in iter_import_records(request):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                imported = await _apply_import_batch(batch)
+                weather_count += imported[0]
+                forecast_count += imported[1]
+                batch = []
+        imported = await _apply_import_batch(batch)
+    except (ValueError, KeyError, TypeError, zlib.error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid import data: {e}")
+    weather_count += imported[0]
+    forecast_count += imported[1]
+    return {"detail": "Import complete", "weather_data": weather_count, "forecast_data": forecast_count}
 
 
 def janitor_bot():
@@ -741,7 +1909,9 @@ def custom_openapi():
             "bearerFormat": "JWT",
         }
     }
-    routes_with_auth = ["/update_weather/", "/weather_data/{lat}/{lon}", "/forecast_data/{lat}/{lon}"]
+    routes_with_auth = ["/update_weather/", "/weather_data/{lat}/{lon}", "/forecast_data/{lat}/{lon}",
+                        "/admin/export", "/admin/import", "/admin/stats",
+                        "/admin/profiling"]
     for route in routes_with_auth:
         if route in openapi_schema["paths"]:
             for method in openapi_schema["paths"][route]:
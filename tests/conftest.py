@@ -0,0 +1,64 @@
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENWEATHERMAP_API_KEY", "test")
+
+# The committed service account key is a placeholder, so skip loading it
+with mock.patch("firebase_admin.credentials.Certificate"), mock.patch("firebase_admin.initialize_app"):
+    import main
+
+
+@pytest.fixture
+def forecast_data():
+    def item(dt):
+        return {
+            "dt": dt,
+            "main": {"temp": 20.4, "feels_like": 18.86, "temp_min": 17.27, "temp_max": 20.4, "pressure": 1017,
+                     "sea_level": 1017, "grnd_level": 840, "humidity": 14, "temp_kf": 3.13},
+            "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}],
+            "clouds": {"all": 0},
+            "wind": {"speed": 3.63, "deg": 322, "gust": 6.39},
+            "visibility": 10000,
+            "pop": 0.2,
+            "sys": {"pod": "d"},
+            "dt_txt": main.datetime.fromtimestamp(dt, main.timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+    return {
+        "cod": "200",
+        "message": 0,
+        "cnt": 40,
+        "list": [item(1720710000 + i * 10800) for i in range(40)],
+        "city": {"id": 7870410, "name": "Albertskroon", "coord": {"lat": -26.1404, "lon": 27.9769},
+                 "country": "ZA", "population": 0, "timezone": 7200, "sunrise": 1720673714, "sunset": 1720711896},
+    }
+
+
+@pytest.fixture
+def sqlite_backend(monkeypatch):
+    """Run against a fresh in-memory SQLite database and an empty forecast cache."""
+    conn = main.sqlite3.connect(':memory:', check_same_thread=False)
+    conn.execute('CREATE TABLE weather_data (user_id TEXT, lat REAL, lon REAL, timestamp TEXT, data TEXT)')
+    conn.execute('CREATE TABLE forecast_data (user_id TEXT, lat REAL, lon REAL, data TEXT)')
+    monkeypatch.setattr(main, "use_redis", False)
+    monkeypatch.setattr(main, "sqlite_conn", conn)
+    monkeypatch.setattr(main, "sqlite_cursor", conn.cursor())
+    monkeypatch.setattr(main, "forecast_cache", main.ForecastCache(1024 * 1024))
+    monkeypatch.setattr(main, "HOUDINI", True)
+    return conn
+
+
+@pytest.fixture
+def redis_backend(monkeypatch):
+    """Run against an in-process fake Redis and an empty forecast cache."""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(main, "use_redis", True)
+    monkeypatch.setattr(main, "r", client)
+    monkeypatch.setattr(main, "forecast_cache", main.ForecastCache(1024 * 1024))
+    monkeypatch.setattr(main, "HOUDINI", True)
+    return client
@@ -0,0 +1,140 @@
+import asyncio
+import copy
+import json
+
+import main
+from main import CompactForecast, ForecastCache
+
+
+def test_round_trip(forecast_data):
+    assert CompactForecast(forecast_data).to_response() == forecast_data
+
+
+def test_round_trip_keeps_optional_fields(forecast_data):
+    forecast_data["list"][0]["rain"] = {"3h": 0.5}
+    forecast_data["list"][1]["snow"] = {"3h": 1.25}
+    del forecast_data["list"][2]["wind"]["gust"]
+    del forecast_data["list"][2]["visibility"]
+    assert CompactForecast(forecast_data).to_response() == forecast_data
+
+
+def test_weather_conditions_are_shared(forecast_data):
+    first = CompactForecast(forecast_data)
+    second = CompactForecast(copy.deepcopy(forecast_data))
+    assert first.weather[0] is second.weather[0]
+
+
+def test_evicts_least_recently_used(forecast_data):
+    size = CompactForecast(forecast_data).nbytes
+    cache = ForecastCache(size * 2)
+    cache.put("a", forecast_data)
+    cache.put("b", forecast_data)
+    assert cache.get("a") is not None
+    cache.put("c", forecast_data)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.stats()["evictions"] == 1
+
+
+def test_version_mismatch_is_a_miss(forecast_data):
+    cache = ForecastCache(1024 * 1024)
+    cache.put("a", forecast_data, version=1)
+    assert cache.get("a", version=1) == forecast_data
+    assert cache.get("a", version=2) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_skips_unpackable_forecast():
+    cache = ForecastCache(1024 * 1024)
+    cache.put("a", {"list": []})
+    assert cache.get("a") is None
+
+
+def test_save_fills_cache_and_keeps_latest_forecast(sqlite_backend, forecast_data, monkeypatch):
+    current = {"timezone": 7200, "dt": 1720710000, "sys": {"sunrise": 1720673714, "sunset": 1720711896}}
+    newer = copy.deepcopy(forecast_data)
+    newer["list"][0]["main"]["temp"] = 25.0
+    forecasts = [forecast_data, newer]
+
+    async def fetch_weather_data(lat, lon):
+        return copy.deepcopy(current), forecasts.pop(0)
+
+    monkeypatch.setattr(main, "fetch_weather_data", fetch_weather_data)
+    asyncio.run(main.save_weather_data("houdini", 1.0, 2.0))
+    asyncio.run(main.save_weather_data("houdini", 1.0, 2.0))
+
+    assert sqlite_backend.execute("SELECT COUNT(*) FROM forecast_data").fetchone() == (1,)
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [newer]
+    assert main.forecast_cache.stats()["hits"] == 1
+
+    main.forecast_cache.discard(("houdini", 1.0, 2.0))
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [newer]
+    assert asyncio.run(main.get_forecast_data(3.0, 4.0, None)) == []
+
+
+def test_weather_condition_pool_is_capped_and_measured(forecast_data, monkeypatch):
+    monkeypatch.setattr(main, "_weather_conditions", {})
+    monkeypatch.setattr(main, "_weather_conditions_bytes", 0)
+    monkeypatch.setattr(main, "MAX_WEATHER_CONDITIONS", 1)
+    shared_size = CompactForecast(forecast_data).nbytes
+    for i, item in enumerate(forecast_data["list"]):
+        item["weather"][0]["id"] = 1000 + i
+    cache = ForecastCache(1024 * 1024)
+    cache.put("a", forecast_data)
+    stats = cache.stats()
+    assert stats["weather_conditions"] == 1
+    assert stats["weather_conditions_bytes"] > 0
+    assert cache.get("a") == forecast_data
+    # Conditions that did not fit in the pool are counted in the record itself
+    assert stats["bytes"] > shared_size
+
+
+def store_forecast(client, forecast, lat=1.0, lon=2.0):
+    """Write a forecast the way another worker's save_weather_data does."""
+    client.set(f"houdini:forecast_data:{lat}:{lon}", json.dumps(forecast))
+    client.incr(f"houdini:forecast_version:{lat}:{lon}")
+
+
+def test_redis_hit_with_same_version(redis_backend, forecast_data):
+    store_forecast(redis_backend, forecast_data)
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [forecast_data]
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [forecast_data]
+    assert main.forecast_cache.stats()["hits"] == 1
+
+
+def test_redis_version_bump_from_other_worker_invalidates(redis_backend, forecast_data):
+    store_forecast(redis_backend, forecast_data)
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [forecast_data]
+
+    newer = copy.deepcopy(forecast_data)
+    newer["list"][0]["main"]["temp"] = 25.0
+    store_forecast(redis_backend, newer)
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [newer]
+    assert main.forecast_cache.stats()["hits"] == 0
+
+
+def test_redis_forecast_without_version(redis_backend, forecast_data):
+    redis_backend.set("houdini:forecast_data:1.0:2.0", json.dumps(forecast_data))
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [forecast_data]
+    assert redis_backend.get("houdini:forecast_version:1.0:2.0") == b"1"
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [forecast_data]
+    assert main.forecast_cache.stats()["hits"] == 1
+
+
+def test_redis_missing_forecast(redis_backend):
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == []
+    assert redis_backend.get("houdini:forecast_version:1.0:2.0") is None
+
+
+def test_redis_save_fills_cache(redis_backend, forecast_data, monkeypatch):
+    current = {"timezone": 7200, "dt": 1720710000, "sys": {"sunrise": 1720673714, "sunset": 1720711896}}
+
+    async def fetch_weather_data(lat, lon):
+        return copy.deepcopy(current), copy.deepcopy(forecast_data)
+
+    monkeypatch.setattr(main, "fetch_weather_data", fetch_weather_data)
+    asyncio.run(main.save_weather_data("houdini", 1.0, 2.0))
+    assert redis_backend.get("houdini:forecast_version:1.0:2.0") == b"1"
+    assert asyncio.run(main.get_forecast_data(1.0, 2.0, None)) == [forecast_data]
+    assert main.forecast_cache.stats()["hits"] == 1
@@ -0,0 +1,129 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import main
+
+
+class FakeRequest:
+    def __init__(self, body, chunk_size=7):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def stream(self):
+        for i in range(0, len(self.body), self.chunk_size):
+            yield self.body[i:i + self.chunk_size]
+
+
+def weather_record(timestamp, **overrides):
+    record = {"type": "weather_data", "user_id": "u", "lat": 1.5, "lon": 2.0, "timestamp": timestamp,
+              "data": {"temp": timestamp % 100}}
+    record.update(overrides)
+    return record
+
+
+def ndjson(records):
+    return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+def count_weather_rows(conn):
+    return conn.execute("SELECT COUNT(*) FROM weather_data").fetchone()[0]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_iter_import_records(compress):
+    records = [weather_record(i) for i in range(5)]
+    body = ndjson(records)
+    if compress:
+        body = gzip.compress(body)
+    assert asyncio.run(collect(main.iter_import_records(FakeRequest(body)))) == records
+
+
+def test_export_import_round_trip(sqlite_backend):
+    records = [weather_record(1720710000 + i) for i in range(5)]
+    records.append({"type": "forecast_data", "user_id": "u", "lat": 1.5, "lon": 2.0, "timestamp": None,
+                    "data": {"cnt": 40}})
+    asyncio.run(main.import_data(FakeRequest(ndjson(records)), batch_size=2, token=None))
+
+    async def export():
+        return b"".join([chunk async for chunk in main.iter_gzip(main.iter_export_lines(2))])
+
+    exported = gzip.decompress(asyncio.run(export())).decode().splitlines()
+    assert [json.loads(line) for line in exported] == records
+
+
+def test_bad_record_rolls_back_its_batch(sqlite_backend):
+    records = [weather_record(1), weather_record(2), weather_record(3), weather_record(4, lat="north")]
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main.import_data(FakeRequest(ndjson(records)), batch_size=2, token=None))
+    assert excinfo.value.status_code == 400
+    assert not sqlite_backend.in_transaction
+    assert count_weather_rows(sqlite_backend) == 2
+
+
+def test_failed_write_is_rolled_back(sqlite_backend):
+    sqlite_backend.execute("CREATE TRIGGER reject BEFORE INSERT ON weather_data WHEN NEW.user_id = 'rejected' "
+                           "BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+    with pytest.raises(main.sqlite3.Error):
+        main._import_batch([weather_record(1), weather_record(2, user_id="rejected")])
+    assert not sqlite_backend.in_transaction
+    assert count_weather_rows(sqlite_backend) == 0
+
+
+def test_unknown_record_type_is_rejected(sqlite_backend):
+    with pytest.raises(ValueError):
+        main._import_batch([weather_record(1), weather_record(2, type="other")])
+    assert count_weather_rows(sqlite_backend) == 0
+
+
+def export_records(batch_size=2):
+    async def export():
+        return b"".join([chunk async for chunk in main.iter_gzip(main.iter_export_lines(batch_size))])
+
+    lines = gzip.decompress(asyncio.run(export())).decode().splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_redis_export_import_round_trip(redis_backend):
+    now = int(main.time.time())
+    records = [weather_record(now - i, lat=-26.1404, lon=27.9769) for i in range(5)]
+    records.append(weather_record(now, user_id="other"))
+    forecast = {"type": "forecast_data", "user_id": "u", "lat": -26.1404, "lon": 27.9769, "timestamp": None,
+                "data": {"cnt": 40}}
+    records.append(forecast)
+    result = asyncio.run(main.import_data(FakeRequest(ndjson(records)), batch_size=3, token=None))
+    assert (result["weather_data"], result["forecast_data"]) == (6, 1)
+    assert redis_backend.ttl(f"u:weather_data:-26.1404:27.9769:{now}") > 0
+
+    exported = export_records()
+    key = lambda record: (record["type"], record["user_id"], record["timestamp"] or 0)
+    assert sorted(exported, key=key) == sorted(records, key=key)
+
+
+def test_redis_import_drops_expired_records(redis_backend):
+    expired = int(main.time.time()) - 31 * 24 * 3600
+    result = asyncio.run(main.import_data(FakeRequest(ndjson([weather_record(expired)])), batch_size=2, token=None))
+    assert result["weather_data"] == 0
+    assert redis_backend.keys("*") == []
+
+
+def test_redis_import_bumps_forecast_version(redis_backend, forecast_data):
+    redis_backend.set("u:forecast_data:1.5:2.0", json.dumps(forecast_data))
+    redis_backend.set("u:forecast_version:1.5:2.0", 3)
+    main.forecast_cache.put(("u", 1.5, 2.0), forecast_data, 3)
+    record = {"type": "forecast_data", "user_id": "u", "lat": 1.5, "lon": 2.0, "timestamp": None, "data": {"cnt": 1}}
+    asyncio.run(main.import_data(FakeRequest(ndjson([record])), batch_size=2, token=None))
+    assert redis_backend.get("u:forecast_version:1.5:2.0") == b"4"
+    assert main.forecast_cache.stats()["entries"] == 0
+
+
+def test_redis_export_skips_keys_expired_between_scan_and_mget():
+    lines = list(main._export_redis_batch("weather_data", [b"u:weather_data:1.5:2.0:10"], [None]))
+    assert lines == []
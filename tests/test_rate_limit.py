@@ -0,0 +1,131 @@
+import pytest
+import redis
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(main.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = main.TokenBucketLimiter()
+    monkeypatch.setattr(main, "rate_limiter", limiter)
+    monkeypatch.setattr(main, "RATE_LIMIT_TIERS", {"default": (2.0, 1.0), "pro": (5.0, 1.0)})
+    return limiter
+
+
+def test_parse_rate_limit_tiers():
+    assert main._parse_rate_limit_tiers("free=10/60, pro=60/60") == {"free": (10.0, 10 / 60), "pro": (60.0, 1.0)}
+
+
+def test_bucket_allows_burst_then_refills(clock, limiter):
+    assert limiter.acquire("u", 2, 1) == 0
+    assert limiter.acquire("u", 2, 1) == 0
+    assert limiter.acquire("u", 2, 1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert limiter.acquire("u", 2, 1) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert limiter.acquire("u", 2, 1) == 0
+
+
+def test_buckets_are_per_key(clock, limiter):
+    assert limiter.acquire("a", 1, 1) == 0
+    assert limiter.acquire("a", 1, 1) > 0
+    assert limiter.acquire("b", 1, 1) == 0
+
+
+def test_evicts_least_recently_used_bucket(clock, limiter, monkeypatch):
+    monkeypatch.setattr(main.TokenBucketLimiter, "max_buckets", 2)
+    limiter.acquire("a", 2, 1)
+    limiter.acquire("b", 2, 1)
+    limiter.acquire("a", 2, 1)
+    limiter.acquire("c", 2, 1)
+    assert list(limiter._buckets) == ["a", "c"]
+
+
+def test_check_rate_limit_uses_tier(clock, limiter):
+    for _ in range(5):
+        main.check_rate_limit("u", "pro")
+    with pytest.raises(HTTPException) as excinfo:
+        main.check_rate_limit("u", "pro")
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers == {"Retry-After": "1"}
+
+
+def test_unknown_tier_uses_default(clock, limiter):
+    main.check_rate_limit("u", "unknown")
+    main.check_rate_limit("u", None)
+    with pytest.raises(HTTPException):
+        main.check_rate_limit("u", "unknown")
+
+
+def test_over_limit_update_is_rejected_before_upstream(clock, limiter, monkeypatch):
+    calls = []
+
+    async def save_weather_data(user_id, lat, lon):
+        calls.append((user_id, lat, lon))
+
+    monkeypatch.setattr(main, "HOUDINI", True)
+    monkeypatch.setattr(main, "save_weather_data", save_weather_data)
+    client = TestClient(main.app, headers={"Authorization": "Bearer token"})
+    assert client.post("/update_weather/?lat=1&lon=2").status_code == 200
+    assert client.post("/update_weather/?lat=1&lon=2").status_code == 200
+    response = client.post("/update_weather/?lat=1&lon=2")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert len(calls) == 2
+
+
+@pytest.fixture
+def wall_clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(main.time, "time", clock)
+    return clock
+
+
+def test_redis_bucket_refills(redis_backend, wall_clock, clock):
+    limiter = main.RedisTokenBucketLimiter(redis_backend, main.TokenBucketLimiter())
+    assert limiter.acquire("u", 2, 0.5) == 0
+    assert limiter.acquire("u", 2, 0.5) == 0
+    assert limiter.acquire("u", 2, 0.5) == pytest.approx(2.0)
+    wall_clock.now += 1
+    assert limiter.acquire("u", 2, 0.5) == pytest.approx(1.0)
+    wall_clock.now += 1
+    assert limiter.acquire("u", 2, 0.5) == 0
+    # The bucket expires once it would have refilled completely
+    assert 0 < redis_backend.ttl("u:rate_limit") <= 5
+
+
+def test_redis_buckets_are_shared_between_workers(redis_backend, wall_clock, clock):
+    first = main.RedisTokenBucketLimiter(redis_backend, main.TokenBucketLimiter())
+    second = main.RedisTokenBucketLimiter(redis_backend, main.TokenBucketLimiter())
+    assert first.acquire("u", 1, 1) == 0
+    assert second.acquire("u", 1, 1) > 0
+
+
+def test_redis_errors_fall_back_to_local_limiter(clock):
+    class BrokenRedis:
+        def register_script(self, script):
+            def run(keys, args):
+                raise redis.ConnectionError("connection refused")
+
+            return run
+
+    limiter = main.RedisTokenBucketLimiter(BrokenRedis(), main.TokenBucketLimiter())
+    assert limiter.acquire("u", 1, 1) == 0
+    assert limiter.acquire("u", 1, 1) == pytest.approx(1.0)
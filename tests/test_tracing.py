@@ -0,0 +1,93 @@
+import asyncio
+import copy
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app, headers={"Authorization": "Bearer token"})
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    settings = {"sample_rate": 0.0, "slow_ms": 1000.0}
+    monkeypatch.setattr(main, "profiling_settings", settings)
+    monkeypatch.setattr(main, "PROFILE_DIR", str(tmp_path))
+    return settings
+
+
+def server_timing(response):
+    return dict(entry.split(";dur=") for entry in response.headers["Server-Timing"].split(", "))
+
+
+def test_span_outside_request_is_a_no_op():
+    with main.span("anything"):
+        pass
+
+
+def test_server_timing_header(client, profiling):
+    timings = server_timing(client.get("/"))
+    assert list(timings) == ["total"]
+    assert float(timings["total"]) >= 0
+
+
+def test_update_weather_stages(client, profiling, sqlite_backend, forecast_data, monkeypatch):
+    current = {"timezone": 7200, "dt": 1720710000, "sys": {"sunrise": 1720673714, "sunset": 1720711896}}
+
+    async def fetch_weather_data(lat, lon):
+        return copy.deepcopy(current), copy.deepcopy(forecast_data)
+
+    monkeypatch.setattr(main, "fetch_weather_data", fetch_weather_data)
+    monkeypatch.setattr(main, "rate_limiter", main.TokenBucketLimiter())
+    response = client.post("/update_weather/?lat=1&lon=2")
+    assert response.status_code == 200
+    assert list(server_timing(response)) == ["rate_limit", "convert", "encode", "storage", "cache", "total"]
+
+
+def test_profiles_slow_requests(client, profiling, tmp_path):
+    profiling.update(sample_rate=1.0, slow_ms=0.0)
+    client.get("/")
+    assert [path.name.endswith("-root.prof") for path in tmp_path.iterdir()] == [True]
+
+
+def test_keeps_only_newest_profiles(client, profiling, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "PROFILE_MAX_FILES", 2)
+    profiling.update(sample_rate=1.0, slow_ms=0.0)
+    for i in range(4):
+        (tmp_path / f"old-{i}.prof").write_bytes(b"")
+        main.os.utime(tmp_path / f"old-{i}.prof", (i, i))
+    client.get("/")
+    client.get("/")
+    assert len(list(tmp_path.iterdir())) == 2
+    assert not any(path.name.startswith("old-") for path in tmp_path.iterdir())
+
+
+def test_skips_fast_requests(client, profiling, tmp_path):
+    profiling.update(sample_rate=1.0, slow_ms=60000.0)
+    client.get("/")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiling_settings_are_shared_through_redis(profiling, monkeypatch):
+    class FakeRedis:
+        def __init__(self):
+            self.hashes = {}
+
+        def hset(self, key, mapping):
+            self.hashes.setdefault(key, {}).update({k.encode(): str(v).encode() for k, v in mapping.items()})
+
+        def hgetall(self, key):
+            return dict(self.hashes.get(key, {}))
+
+    monkeypatch.setattr(main, "use_redis", True)
+    monkeypatch.setattr(main, "r", FakeRedis())
+    monkeypatch.setattr(main, "HOUDINI", True)
+    asyncio.run(main.configure_profiling(sample_rate=0.25, slow_ms=None, token=None))
+
+    # Another worker still holding the startup settings picks up the change
+    profiling.update(sample_rate=0.0, slow_ms=1000.0)
+    assert main.get_profiling_settings(refresh=True) == {"sample_rate": 0.25, "slow_ms": 1000.0}
@@ -0,0 +1,180 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import main
+
+
+class FakeClient:
+    """
+    Answers each GET according to a plan of outcomes: a status code, a
+    (status code, headers) pair, "error", or "slow".
+    """
+
+    def __init__(self, plan):
+        self.plan = list(plan)
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    async def get(self, url, timeout=None):
+        assert not self.closed
+        outcome = self.plan[min(self.calls, len(self.plan) - 1)]
+        self.calls += 1
+        try:
+            if outcome == "error":
+                raise httpx.ConnectError("connection refused")
+            if outcome == "slow":
+                await asyncio.sleep(10)
+            await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            # Only count calls stopped while the client was still open
+            if not self.closed:
+                self.cancelled += 1
+            raise
+        if outcome == "slow":
+            return httpx.Response(200, json={"url": url})
+        status_code, headers = outcome if isinstance(outcome, tuple) else (outcome, {})
+        return httpx.Response(status_code, headers=headers, json={"url": url})
+
+
+@pytest.fixture(autouse=True)
+def upstream_policy(monkeypatch):
+    monkeypatch.setattr(main, "upstream_stats", dict.fromkeys(main.upstream_stats, 0))
+    monkeypatch.setattr(main, "upstream_latencies", main.deque(maxlen=200))
+    monkeypatch.setattr(main, "UPSTREAM_RETRIES", 2)
+    monkeypatch.setattr(main, "UPSTREAM_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(main, "UPSTREAM_BACKOFF_MAX_SECONDS", 0.05)
+    monkeypatch.setattr(main, "UPSTREAM_HEDGE_PERCENTILE", 0)
+    monkeypatch.setattr(main, "UPSTREAM_DEADLINE_SECONDS", 1)
+
+
+def get(client):
+    async def run():
+        return await main._get_with_retries(client, "https://example.test", asyncio.get_running_loop().time() + 1)
+
+    return asyncio.run(run())
+
+
+def test_retries_transport_errors_and_server_errors():
+    client = FakeClient(["error", 503, 200])
+    assert get(client).status_code == 200
+    assert main.upstream_stats["requests"] == 3
+    assert main.upstream_stats["retries"] == 2
+
+
+def test_raises_when_retries_run_out():
+    with pytest.raises(main.UpstreamError) as excinfo:
+        get(FakeClient([500]))
+    assert excinfo.value.status_code == 500
+    assert main.upstream_stats["requests"] == 3
+
+
+def test_does_not_retry_rate_limit_without_retry_after():
+    with pytest.raises(main.UpstreamError) as excinfo:
+        get(FakeClient([429, 200]))
+    assert excinfo.value.status_code == 429
+    assert main.upstream_stats["requests"] == 1
+
+
+def test_honours_retry_after():
+    client = FakeClient([(429, {"Retry-After": "0"}), 200])
+    assert get(client).status_code == 200
+    assert main.upstream_stats["retries"] == 1
+
+
+def test_gives_up_when_retry_after_passes_deadline():
+    with pytest.raises(main.UpstreamError):
+        get(FakeClient([(429, {"Retry-After": "5"}), 200]))
+    assert main.upstream_stats["requests"] == 1
+
+
+def test_does_not_retry_client_errors():
+    with pytest.raises(main.UpstreamError):
+        get(FakeClient([401]))
+    assert main.upstream_stats["requests"] == 1
+
+
+def test_hedges_slow_requests(monkeypatch):
+    monkeypatch.setattr(main, "UPSTREAM_HEDGE_PERCENTILE", 90)
+    main.upstream_latencies.extend([0.02] * main.HEDGE_MIN_SAMPLES)
+    client = FakeClient(["slow", 200])
+    assert get(client).status_code == 200
+    assert main.upstream_stats["hedges"] == 1
+    assert main.upstream_stats["hedge_wins"] == 1
+    assert client.cancelled == 1
+
+
+def test_hedging_needs_enough_samples(monkeypatch):
+    monkeypatch.setattr(main, "UPSTREAM_HEDGE_PERCENTILE", 90)
+    assert main._hedge_delay() is None
+    main.upstream_latencies.extend([0.01 * i for i in range(1, 101)])
+    assert main._hedge_delay() == pytest.approx(0.91)
+
+
+def test_fetch_maps_exhausted_retries_to_502(monkeypatch):
+    client = FakeClient([502])
+    monkeypatch.setattr(main.httpx, "AsyncClient", lambda: client)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main.fetch_weather_data(1.0, 2.0))
+    assert excinfo.value.status_code == 502
+    assert main.upstream_stats["failures"] == 1
+
+
+def test_fetch_cancels_other_call_on_failure(monkeypatch):
+    class OneFails(FakeClient):
+        async def get(self, url, timeout=None):
+            if "/weather?" in url:
+                raise httpx.ConnectError("connection refused")
+            return await super().get(url, timeout)
+
+    client = OneFails(["slow"])
+    monkeypatch.setattr(main, "UPSTREAM_RETRIES", 0)
+    monkeypatch.setattr(main.httpx, "AsyncClient", lambda: client)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main.fetch_weather_data(1.0, 2.0))
+    assert excinfo.value.status_code == 502
+    assert client.cancelled == 1
+
+
+def test_fetch_deadline(monkeypatch):
+    monkeypatch.setattr(main, "UPSTREAM_DEADLINE_SECONDS", 0.1)
+    monkeypatch.setattr(main.httpx, "AsyncClient", lambda: FakeClient(["slow"]))
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main.fetch_weather_data(1.0, 2.0))
+    assert excinfo.value.status_code == 504
+    assert main.upstream_stats["deadline_exceeded"] == 1
+
+
+def test_hedge_rate_matches_percentile(monkeypatch):
+    class LongTail(FakeClient):
+        def __init__(self):
+            super().__init__([200])
+            self.random = random.Random(7)
+
+        async def get(self, url, timeout=None):
+            await asyncio.sleep(0.01 + self.random.expovariate(1 / 0.03))
+            return httpx.Response(200)
+
+    monkeypatch.setattr(main, "UPSTREAM_HEDGE_PERCENTILE", 80)
+    client = LongTail()
+
+    async def run(requests):
+        for _ in range(requests // 25):
+            deadline = asyncio.get_running_loop().time() + 5
+            await asyncio.gather(*(main._hedged_get(client, "https://example.test", deadline) for _ in range(25)))
+
+    asyncio.run(run(200))
+    main.upstream_stats["hedges"] = 0
+    asyncio.run(run(500))
+    # Each request is hedged when it outlasts the 80th percentile, so about 20% should be
+    assert 0.13 < main.upstream_stats["hedges"] / 500 < 0.27